@@ -1,5 +1,6 @@
 from __future__ import annotations
 import os, glob, shutil, subprocess
+from datetime import datetime
 from pathlib import Path
 
 import streamlit as st
@@ -7,12 +8,17 @@ import pandas as pd
 
 from epps_shocks.modeling_grid import generate_model_grid, write_grid_batches, filter_pending_models
 from epps_shocks.merge_results import merge_model_results, rank_models
-from epps_shocks.config import DATA_RAW, DATA_INTERIM, MAX_LAG
+from epps_shocks.config import DATA_RAW, DATA_INTERIM, MAX_LAG, OUTCOME_FAMILIES
 from epps_shocks.prep import build_and_save
 from epps_shocks.features import build_full_panel
+from epps_shocks.tracing import new_run, use_run, span
 
 
 st.set_page_config(page_title="Shocks & EPPs – Modeling")
+# Trace run id lives in session_state: widget reruns keep it, and a new run is
+# started only when the pipeline runs (panel rebuild, R batches, merge).
+if "run_id" in st.session_state:
+    use_run(st.session_state["run_id"])
 
 
 def find_rscript(user_path = None):
@@ -56,28 +62,35 @@ def get_project_root(start):
 
 
 st.title("Data Overview")
-st.subheader("Raw data")
-don_path    = DATA_RAW / "DONdatabase.csv"
-shocks_path = DATA_RAW / "Shocks_Database_counts.csv"
+rebuild = st.button("Rebuild panel")
+panel_out = Path("data/03_processed/full_panel.csv")
 
-don_out, shocks_out = build_and_save(don_path, shocks_path)
-st.success("Processed files saved")
+if rebuild or "panel_built" not in st.session_state:
+    st.session_state["run_id"] = new_run()
 
-don_df    = pd.read_csv(don_out)
-shocks_df = pd.read_csv(shocks_out)
+    st.subheader("Raw data")
+    don_path    = DATA_RAW / "DONdatabase.csv"
+    shocks_path = DATA_RAW / "Shocks_Database_counts.csv"
 
+    don_out, shocks_out = build_and_save(don_path, shocks_path)
+    st.success("Processed files saved")
 
-st.subheader("Preprocessed data")
-shocks_file = DATA_INTERIM / "shocks_processed.csv"
-don_file    = DATA_INTERIM / "don_processed.csv"
+    st.subheader("Preprocessed data")
+    shocks_df = pd.read_csv(shocks_out)
+    don_df    = pd.read_csv(don_out)
 
-shocks_df = pd.read_csv(shocks_file)
-don_df    = pd.read_csv(don_file)
+    panel = build_full_panel(shocks_df=shocks_df, don_df=don_df, max_lag=int(MAX_LAG))
+    panel_out.parent.mkdir(parents=True, exist_ok=True)
+    with span("save_full_panel", rows=len(panel), cols=panel.shape[1]) as attrs:
+        panel.to_csv(panel_out, index=False)
+        attrs["file_mb"] = round(panel_out.stat().st_size / 2**20, 3)
+    st.session_state["panel"] = panel
+    st.session_state["panel_built"] = (datetime.now(), st.session_state["run_id"])
 
-panel = build_full_panel(shocks_df=shocks_df, don_df=don_df, max_lag=int(MAX_LAG))
-panel_out = Path("data/03_processed/full_panel.csv")
-panel_out.parent.mkdir(parents=True, exist_ok=True)
-panel.to_csv(panel_out, index=False)
+panel = st.session_state["panel"]
+built_at, built_run = st.session_state["panel_built"]
+st.caption(f"Panel built {built_at:%Y-%m-%d %H:%M:%S} (trace run {built_run}). "
+           "Click Rebuild panel to pick up changes to the raw CSVs.")
 
 st.subheader("Preview")
 st.caption(f"Rows: {len(panel):,} • Columns: {panel.shape[1]}")
@@ -97,6 +110,14 @@ with st.expander("Grid options", expanded=True):
                              value="\n".join(["Year","outbreak_lag"]))
     predictors = [p.strip() for p in preds_raw.splitlines() if p.strip()]
 
+    dvs = st.multiselect("Outcomes (DVs)", list(OUTCOME_FAMILIES), default=["outbreak"])
+    # glmer fits negative binomial via glmer.nb (NB2 only)
+    family_opts = ["binomial","poisson","nbinom2"] + (["nbinom1"] if engine == "glmmTMB" else [])
+    families = {
+        dv: st.selectbox(f"Family for {dv}", family_opts, index=family_opts.index(OUTCOME_FAMILIES[dv]))
+        for dv in dvs
+    }
+
     scopes = st.multiselect("Scopes", ["Global","Africa","Asia","Europe","America"],
                             default=["Global","Africa","Asia","Europe","America"])
     fe_by_scope   = {s: [""] for s in scopes}
@@ -113,16 +134,21 @@ st.write({
 })
 
 if st.button("Build model grid"):
+    if not dvs:
+        st.warning("Select at least one outcome.")
+        st.stop()
+    st.session_state["run_id"] = new_run()
     grid = generate_model_grid(
         predictors=predictors,
         fixed_effects=fe_by_scope,
         scopes=scopes,
-        dv="outbreak",
+        dv=dvs,
         max_predictors_per_model=6,
         min_predictors_per_model=1,
         year_terms_by_scope=year_by_scope,
         random_terms_by_scope=re_by_scope,
         engine=engine,
+        families=families,
     )
     st.session_state["grid"] = grid
     st.success(f"Grid built with {len(grid):,} specs.")
@@ -135,6 +161,7 @@ if st.button("Write pending batches"):
     if grid is None:
         st.warning("Build the grid first.")
     else:
+        st.session_state["run_id"] = new_run()
         pending = filter_pending_models(grid, output_dir=results_dir, merged_file=merged_out)
         st.write(f"Pending: {len(pending):,}")
         paths = write_grid_batches(pending, out_dir=specs_dir, basename="model_grid", batch_size=batch_size)
@@ -142,6 +169,7 @@ if st.button("Write pending batches"):
 
 st.subheader("Run R on batches")
 if st.button("Run R now"):
+    st.session_state["run_id"] = new_run()
     app_path = Path(__file__).resolve()
     project_root = get_project_root(app_path.parent)
     r_script = project_root / "r" / "run_grid.R"
@@ -152,49 +180,60 @@ if st.button("Run R now"):
     Path(results_abs).mkdir(parents=True, exist_ok=True)
     st.write(f"panel_abs: {panel_abs}")
     batch_files = sorted(p for p in specs_dir_path.glob("model_grid_*.csv"))
+    spec_counts = {}
+    for b in batch_files:
+        with open(b, encoding="utf-8") as fh:
+            spec_counts[b] = sum(1 for _ in fh) - 1
 
     pb = st.progress(0.0, text="Running R batches…")
-    for i, b in enumerate(batch_files, start=1):
-        b_abs = str(b.resolve())
-        cmd = [
-            rscript_exe,
-            str(r_script),
-            b_abs,
-            panel_abs,
-            results_abs
-        ]
-        st.code(" ".join(f'"{c}"' if " " in c else c for c in cmd), language="bash")
-
-        try:
-            proc = subprocess.run(
-                cmd,
-                check=True,
-                cwd=str(project_root),
-                capture_output=True,
-                text=True
-            )
-            if proc.stdout:
-                st.text_area(f"R stdout ({b.name})", proc.stdout, height=120)
-            if proc.stderr:
-                st.text_area(f"R stderr ({b.name})", proc.stderr, height=120)
-        except FileNotFoundError as e:
-            st.error("Windows could not find a file from the above command (likely Rscript path).")
-            st.exception(e)
-            st.stop()
-        except subprocess.CalledProcessError as e:
-            st.error(f"R failed on {b.name} with exit code {e.returncode}. See stderr above.")
-            if e.stdout:
-                st.text_area(f"R stdout ({b.name})", e.stdout, height=120)
-            if e.stderr:
-                st.text_area(f"R stderr ({b.name})", e.stderr, height=200)
-            st.stop()
-
-        pb.progress(i / len(batch_files), text=f"Completed {i}/{len(batch_files)}")
+    with span("run_batches", n_batches=len(batch_files), specs=sum(spec_counts.values())):
+        for i, b in enumerate(batch_files, start=1):
+            b_abs = str(b.resolve())
+            cmd = [
+                rscript_exe,
+                str(r_script),
+                b_abs,
+                panel_abs,
+                results_abs
+            ]
+            st.code(" ".join(f'"{c}"' if " " in c else c for c in cmd), language="bash")
+
+            try:
+                with span("r_batch", memory=False, batch=b.name, specs=spec_counts[b],
+                          file_mb=round(b.stat().st_size / 2**20, 3)) as attrs:
+                    proc = subprocess.run(
+                        cmd,
+                        check=False,
+                        cwd=str(project_root),
+                        capture_output=True,
+                        text=True
+                    )
+                    attrs["returncode"] = proc.returncode
+                    if proc.returncode != 0:
+                        raise subprocess.CalledProcessError(proc.returncode, cmd, proc.stdout, proc.stderr)
+                if proc.stdout:
+                    st.text_area(f"R stdout ({b.name})", proc.stdout, height=120)
+                if proc.stderr:
+                    st.text_area(f"R stderr ({b.name})", proc.stderr, height=120)
+            except FileNotFoundError as e:
+                st.error("Windows could not find a file from the above command (likely Rscript path).")
+                st.exception(e)
+                st.stop()
+            except subprocess.CalledProcessError as e:
+                st.error(f"R failed on {b.name} with exit code {e.returncode}. See stderr above.")
+                if e.stdout:
+                    st.text_area(f"R stdout ({b.name})", e.stdout, height=120)
+                if e.stderr:
+                    st.text_area(f"R stderr ({b.name})", e.stderr, height=200)
+                st.stop()
+
+            pb.progress(i / len(batch_files), text=f"Completed {i}/{len(batch_files)}")
     pb.empty()
     st.success("Finished R runs.")
 
 # Merge results
 if st.button("Merge results"):
+    st.session_state["run_id"] = new_run()
     merged = merge_model_results(
         input_dir=results_dir,
         output_file=merged_out,
@@ -202,7 +241,8 @@ if st.button("Merge results"):
         delete_after=False
     )
     st.write(f"Merged rows: {len(merged):,}")
-    st.dataframe(rank_models(merged).head(30), use_container_width=True)
+    # AICs are not comparable across outcomes: rank within each DV
+    st.dataframe(rank_models(merged, by="dv", top_n=10), use_container_width=True)
     try:
         with open(merged_out, "rb") as fh:
             st.download_button(
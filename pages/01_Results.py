@@ -23,11 +23,12 @@ score = "aicc" if "aicc" in df.columns else "aic"
 ranked = df.sort_values(score, ascending=True).reset_index(drop=True)
 
 # Top 30 overall
-st.write(ranked[[c for c in ["spec_id","scope","dv","formula","engine",score, "aic", "n"] if c in ranked.columns]].head(30))
+st.write(ranked[[c for c in ["spec_id","scope","dv","family","formula","engine",score, "aic", "n"] if c in ranked.columns]].head(30))
 
-# Best per scope
+# Best per scope (and per DV: AICs are not comparable across outcomes)
 if "scope" in ranked.columns:
-    best_per_scope = ranked.sort_values([ "scope", score ]).groupby("scope", as_index=False).first()
+    keys = ["scope", "dv"] if "dv" in ranked.columns else ["scope"]
+    best_per_scope = ranked.sort_values(keys + [score]).groupby(keys, as_index=False).first()
     st.write("\nBest per scope:")
-    st.write(best_per_scope[["scope","spec_id","engine",score, "aic", "n","formula"]])
+    st.write(best_per_scope[[c for c in keys + ["family","spec_id","engine",score, "aic", "n","formula"] if c in best_per_scope.columns]])
     best_per_scope.to_csv("results/summaries/best_per_scope_lags.csv", index=False)
@@ -0,0 +1,114 @@
+# 02_Profiling.py
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from epps_shocks.config import TRACE_FILE
+from epps_shocks.tracing import read_trace
+
+st.set_page_config(page_title="Profiling", layout="wide")
+
+st.title("Profiling")
+st.caption(f"Trace file: {TRACE_FILE}")
+
+MAX_BARS = 80
+last_runs = st.number_input("Runs to load (newest)", min_value=5, max_value=1000, value=50, step=5)
+trace = read_trace(last_runs=int(last_runs))
+if trace.empty:
+    st.info("No trace recorded yet. Run the pipeline from the main page first.")
+    st.stop()
+
+# One row per run, newest first
+runs = (
+    trace.groupby("run_id", as_index=False)
+         .agg(start=("start", "min"), spans=("name", "size"), total_s=("duration_s", "sum"))
+         .sort_values("start", ascending=False)
+)
+labels = {r.run_id: f"{r.start:%Y-%m-%d %H:%M:%S} · {r.run_id} · {r.spans} spans" for r in runs.itertuples()}
+run_id = st.selectbox("Run", runs["run_id"].tolist(), format_func=labels.get)
+
+# ---------- timeline of the selected run ----------
+st.subheader("Stage timeline")
+run = trace[trace["run_id"] == run_id].sort_values("start").reset_index(drop=True)
+t0 = run["start"].min()
+run["offset_s"] = (run["start"] - t0).dt.total_seconds()
+
+# R batches are folded into their run_batches bar unless asked for
+show_batches = st.checkbox("Show individual R batches", value=False)
+tl = run if show_batches else run[run["name"] != "r_batch"]
+if len(tl) > MAX_BARS:
+    st.caption(f"Showing the first {MAX_BARS} of {len(tl)} spans.")
+    tl = tl.head(MAX_BARS)
+tl = tl.reset_index(drop=True)
+
+fig, ax = plt.subplots(figsize=(10, 0.4 * len(tl) + 1))
+for i, r in tl.iterrows():
+    color = "tab:red" if r["status"] == "error" else "tab:blue"
+    ax.broken_barh([(r["offset_s"], max(r["duration_s"], 1e-3))], (i - 0.4, 0.8), color=color)
+ax.set_yticks(range(len(tl)))
+ax.set_yticklabels(["  " * int(d) + n for d, n in zip(tl["depth"], tl["name"])])
+ax.invert_yaxis()
+ax.set_xlabel("seconds since first span")
+st.pyplot(fig)
+plt.close(fig)
+
+cols = [c for c in ["name", "parent", "duration_s", "mem_peak_mb", "mem_end_mb", "status", "error"] if c in run.columns]
+extra = [c for c in run.columns if c.startswith("in_") or c in ("rows_out", "cols_out", "items_out", "rows",
+                                                                 "batch", "specs", "file_mb", "returncode")]
+st.dataframe(run[cols + extra], use_container_width=True)
+
+# ---------- history across runs ----------
+st.subheader("History across runs")
+stages = sorted(trace.loc[~trace["name"].str.startswith("profile:"), "name"].unique())
+picked = st.multiselect("Stages", stages, default=[s for s in stages if s != "r_batch"])
+
+# Per-call durations (median within a run, so repeated calls don't add up);
+# R stages are divided by their spec count so larger batch sets aren't "slower".
+spans = trace[trace["name"].isin(picked)].copy()
+specs = spans["specs"] if "specs" in spans.columns else pd.Series(float("nan"), index=spans.index)
+per_spec = spans["name"].isin(["r_batch", "run_batches"]) & (specs > 0)
+spans["cost"] = spans["duration_s"].where(~per_spec, spans["duration_s"] / specs)
+
+hist = (
+    spans.groupby(["run_id", "name"], as_index=False)
+         .agg(start=("start", "min"), cost=("cost", "median"))
+)
+if not hist.empty:
+    st.caption("Seconds per call (median within run); run_batches and r_batch in seconds per spec.")
+    wide = hist.pivot_table(index="start", columns="name", values="cost").sort_index()
+    st.line_chart(wide)
+
+    # Flag stages where the selected run is much slower than the median of earlier runs
+    cur = hist[hist["run_id"] == run_id].set_index("name")["cost"]
+    prev = hist[hist["start"] < run["start"].min()].groupby("name")["cost"].median()
+    cmp = pd.DataFrame({"this_run": cur, "median_before": prev}).dropna()
+    if not cmp.empty:
+        cmp["ratio"] = cmp["this_run"] / cmp["median_before"].where(cmp["median_before"] > 0)
+        slow = cmp[cmp["ratio"] > 1.5]
+        if not slow.empty:
+            st.warning(f"Slower than usual: {', '.join(slow.index)}")
+        st.dataframe(cmp.sort_values("ratio", ascending=False), use_container_width=True)
+
+    if "mem_peak_mb" not in trace.columns:
+        st.caption("Memory tracing is off. Set EPPS_TRACE_MEMORY=1 before starting Streamlit to record peaks.")
+    else:
+        mem = (
+            trace[trace["name"].isin(picked)]
+                 .groupby(["run_id", "name"], as_index=False)
+                 .agg(start=("start", "min"), mem_peak_mb=("mem_peak_mb", "max"))
+                 .pivot_table(index="start", columns="name", values="mem_peak_mb")
+                 .sort_index()
+        )
+        st.caption("Peak traced memory (MB)")
+        st.line_chart(mem)
+
+# ---------- profiler output ----------
+prof = run[run["name"].str.startswith("profile:")]
+if not prof.empty and "profile_top" in prof.columns:
+    st.subheader("Profiler output")
+    for r in prof.itertuples():
+        with st.expander(f"{r.name} · {r.duration_s:.3f}s"):
+            st.caption(r.profile_file)
+            st.code(r.profile_top)
+else:
+    st.caption("Hot-function profiling is off. Set EPPS_PROFILE=1 before starting Streamlit to enable it.")
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Project root (…/epps-shocks)
@@ -21,3 +22,21 @@ SAVED_MODELS_DIR = ROOT / "saved_models"
 
 # Panel convention: country-level shock counts over several years
 INDEX_VARS = ["Country", "Year"]
+
+# Outcomes produced by build_full_panel and the GLMM family each is fitted with
+OUTCOME_FAMILIES = {
+    "outbreak":           "binomial",
+    "Infectious_disease": "poisson",
+    "CasesTotal":         "nbinom2",
+    "Deaths":             "nbinom2",
+}
+
+# Pipeline tracing: one JSON line per span, appended across runs
+TRACE_DIR    = ROOT / "results" / "traces"
+TRACE_FILE   = TRACE_DIR / "trace.jsonl"
+# Opt-in: tracemalloc peaks per span (EPPS_TRACE_MEMORY=1; slows pandas-heavy code).
+# tracemalloc is process-wide: one session at a time gets memory figures, and its
+# peaks also count allocations of other sessions running concurrently.
+TRACE_MEMORY  = os.environ.get("EPPS_TRACE_MEMORY", "").lower() in ("1", "true", "yes")
+# Opt-in: cProfile of hot functions decorated with @profiled (EPPS_PROFILE=1)
+TRACE_PROFILE = os.environ.get("EPPS_PROFILE", "").lower() in ("1", "true", "yes")
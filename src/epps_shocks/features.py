@@ -4,8 +4,10 @@ import numpy as np
 import pandas as pd
 from typing import Sequence
 from .config import MAX_LAG
+from .tracing import profiled, traced
 
 
+@profiled
 def _add_lags_leads_avgs(df, cols, group_col, time_col, max_lag):
     if max_lag < 1 or not cols:
         return df
@@ -25,6 +27,7 @@ def _add_lags_leads_avgs(df, cols, group_col, time_col, max_lag):
     return out
 
 
+@traced("build_event_panel")
 def build_event_panel(df, *, don_df, max_lag = MAX_LAG):
 
     dv = (
@@ -95,6 +98,7 @@ def build_event_panel(df, *, don_df, max_lag = MAX_LAG):
     return panel
 
 
+@traced("build_full_panel")
 def build_full_panel(shocks_df, don_df, *, max_lag = MAX_LAG):
     full_index = shocks_df[["Country", "Continent", "Year"]].drop_duplicates()
 
@@ -5,6 +5,9 @@ import os
 from typing import List, Optional
 import pandas as pd
 
+from .modeling_grid import _as_list
+from .tracing import traced
+
 
 def _read_any(path: str) -> pd.DataFrame:
     if path.lower().endswith(".parquet"):
@@ -12,6 +15,7 @@ def _read_any(path: str) -> pd.DataFrame:
     return pd.read_csv(path)
 
 
+@traced("merge_model_results")
 def merge_model_results(input_dir, output_file, pattern = "batch_*.csv",
     id_col = "spec_id",
     delete_after = False,
@@ -57,10 +61,12 @@ def merge_model_results(input_dir, output_file, pattern = "batch_*.csv",
     return merged
 
 
-def rank_models(df, score_col = "aicc", ascending = True, top_n = 50):
+def rank_models(df, score_col = "aicc", ascending = True, top_n = 50, by = None):
     if df.empty or score_col not in df.columns:
         return df
-    ranked = df.sort_values(by=[score_col], ascending=ascending).copy()
+    by = [c for c in _as_list(by) if c in df.columns]
+    ranked = df.sort_values(by=by + [score_col], ascending=ascending).copy()
     if top_n:
-        ranked = ranked.head(top_n)
+        ranked = ranked.groupby(by, sort=False).head(top_n) if by else ranked.head(top_n)
     return ranked
+
@@ -6,6 +6,9 @@ import hashlib
 from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import pandas as pd
 
+from .config import OUTCOME_FAMILIES
+from .tracing import traced
+
 
 def _hash_spec(row, cols):
     s = "|".join(str(row[c]) for c in cols)
@@ -20,6 +23,7 @@ def _as_list(x) -> List[str]:
     return list(x)
 
 
+@traced("generate_model_grid")
 def generate_model_grid(
     predictors,
     fixed_effects,
@@ -31,8 +35,11 @@ def generate_model_grid(
     year_terms_by_scope = None,
     random_terms_by_scope = None,
     engine = "glmmTMB",
+    families = None,
 ):
     scopes = list(scopes)
+    dvs = _as_list(dv)
+    families = {**OUTCOME_FAMILIES, **(families or {})}
 
     if year_terms_by_scope is None:
         year_terms_by_scope = {s: ["scale(Year)"] for s in scopes}
@@ -59,27 +66,41 @@ def generate_model_grid(
                         if yr: rhs_parts.append(yr)
                         if re: rhs_parts.append(re)
                         rhs = " + ".join(rhs_parts) if rhs_parts else "1"
-                        rows.append({
-                            "scope": scope,
-                            "dv": dv,
-                            "predictors": " + ".join(base_terms),  
-                            "year_term": yr or "",
-                            "random": re or "",
-                            "extra_fe": fe or "",
-                            "engine": engine,
-                            "rhs": rhs,         
-                        })
+                        # DVs innermost: rows sharing a RHS stay adjacent so the
+                        # runner can prepare the subset once and fit every outcome
+                        for y in dvs:
+                            rows.append({
+                                "scope": scope,
+                                "dv": y,
+                                "family": families.get(y, "binomial"),
+                                "predictors": " + ".join(base_terms),  
+                                "year_term": yr or "",
+                                "random": re or "",
+                                "extra_fe": fe or "",
+                                "engine": engine,
+                                "rhs": rhs,         
+                            })
+
+    out_cols = ["spec_id", "scope", "dv", "family", "predictors", "year_term", "random", "extra_fe", "engine", "rhs"]
+    if not rows:
+        return pd.DataFrame(columns=out_cols)
 
     grid = pd.DataFrame(rows)
     hash_cols = ["scope", "dv", "predictors", "year_term", "random", "extra_fe", "engine"]
-    grid["spec_id"] = grid.apply(lambda r: _hash_spec(r, hash_cols), axis=1)
-
-    grid = grid[["spec_id", "scope", "dv", "predictors", "year_term", "random", "extra_fe", "engine", "rhs"]]
+    # family joins the hash only when it departs from the DV's default, so ids of
+    # default-family specs stay stable while refits under another family get new ids
+    grid["spec_id"] = grid.apply(
+        lambda r: _hash_spec(r, hash_cols + (["family"] if r["family"] != OUTCOME_FAMILIES.get(r["dv"], "binomial") else [])),
+        axis=1,
+    )
+
+    grid = grid[out_cols]
     grid.drop_duplicates(subset=["spec_id"], inplace=True)
 
     return grid
 
 
+@traced("write_grid_batches")
 def write_grid_batches(
     grid,
     out_dir = "specs",
@@ -87,16 +108,39 @@ def write_grid_batches(
     batch_size = 1000,
 ) :
     os.makedirs(out_dir, exist_ok=True)
-    n = len(grid)
     paths = []
-    for i in range(math.ceil(n / batch_size)):
-        batch = grid.iloc[i*batch_size:(i+1)*batch_size].copy()
+    for i, batch in enumerate(_split_batches(grid, batch_size)):
         p = f"{out_dir}/{basename}_{i+1:04}.csv"
         batch.to_csv(p, index=False)
         paths.append(p)
     return paths
 
 
+def _split_batches(grid, batch_size):
+    # Never split a (scope, rhs, engine) group across files: the runner fits
+    # all DVs of a group against one prepared subset.
+    if grid.empty:
+        return
+    keys = [c for c in ("scope", "rhs", "engine") if c in grid.columns]
+    if not keys:
+        for i in range(math.ceil(len(grid) / batch_size)):
+            yield grid.iloc[i*batch_size:(i+1)*batch_size].copy()
+        return
+
+    group_no = grid.groupby(keys, sort=False).ngroup()
+    grid = grid.assign(_group=group_no.values).sort_values("_group", kind="stable")
+
+    start, current = 0, 0
+    sizes = grid["_group"].value_counts(sort=False).reindex(grid["_group"].unique())
+    for size in sizes:
+        if current and current + size > batch_size:
+            yield grid.iloc[start:start + current].drop(columns="_group")
+            start, current = start + current, 0
+        current += size
+    yield grid.iloc[start:start + current].drop(columns="_group")
+
+
+@traced("filter_pending_models")
 def filter_pending_models(
     model_grid,
     output_dir,
@@ -5,6 +5,7 @@ import country_converter as coco
 import streamlit as st
 
 from .config import YEAR_MIN, YEAR_MAX, DATA_RAW, DATA_INTERIM, RARE_THRESHOLD
+from .tracing import traced
 
 def prepare_don_data(don_df):
     don_df['ReportDate'] = pd.to_datetime(don_df['ReportDate'], errors='coerce')
@@ -67,6 +68,7 @@ def prepare_shocks_data(shocks_df):
     return shocks_agg
 
 
+@traced("build_and_save")
 def build_and_save(don_raw, shocks_raw,
                    don_out = "don_processed.csv",
                    shocks_out = "shocks_processed.csv"):
@@ -0,0 +1,224 @@
+# src/tracing.py
+from __future__ import annotations
+import cProfile, functools, inspect, io, json, os, pstats, threading, time, tracemalloc, uuid, warnings
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from .config import TRACE_FILE, TRACE_MEMORY, TRACE_PROFILE
+
+
+_lock = threading.Lock()
+_local = threading.local()
+_default_run = uuid.uuid4().hex[:12]
+_mem_owner = None  # thread ident currently allowed to drive tracemalloc
+_profiling = TRACE_PROFILE
+
+
+# Run ids are per thread: Streamlit runs each session's script in its own thread,
+# so the app keeps the id in session_state and re-applies it with use_run().
+def new_run():
+    _local.run_id = uuid.uuid4().hex[:12]
+    return _local.run_id
+
+
+def use_run(run_id):
+    _local.run_id = run_id
+    return run_id
+
+
+def current_run():
+    return getattr(_local, "run_id", _default_run)
+
+
+def enable_profiling(on = True):
+    global _profiling
+    _profiling = bool(on)
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _write(record, trace_file):
+    # Best-effort: a locked or read-only trace file must never fail the pipeline
+    line = json.dumps(record, default=str)
+    try:
+        path = Path(trace_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _lock, open(path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+    except OSError as e:
+        warnings.warn(f"Could not write trace to {trace_file}: {e}", RuntimeWarning, stacklevel=2)
+
+
+def _claim_memory():
+    # tracemalloc is process-global: only one thread (session) traces at a time,
+    # spans on other threads run without memory figures.
+    global _mem_owner
+    me = threading.get_ident()
+    with _lock:
+        if _mem_owner is None:
+            _mem_owner = me
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            return "owner"
+        return "nested" if _mem_owner == me else None
+
+
+def _release_memory():
+    global _mem_owner
+    with _lock:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _mem_owner = None
+
+
+@contextmanager
+def span(name, trace_file = TRACE_FILE, memory = TRACE_MEMORY, **attrs):
+    # `attrs` is yielded so callers can attach row counts etc. before exit
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    frame = {"name": name, "peak": 0}
+
+    claim = _claim_memory() if memory else None
+    memory = claim is not None
+    if memory:
+        mem_start, outer_peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent["peak"] = max(parent["peak"], outer_peak)
+        tracemalloc.reset_peak()
+
+    stack.append(frame)
+    started = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield attrs
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        stack.pop()
+        record = {
+            "run_id": current_run(),
+            "name": name,
+            "parent": parent["name"] if parent else None,
+            "depth": len(stack),
+            "start": started.isoformat(),
+            "duration_s": round(elapsed, 6),
+            "status": status,
+            "error": error,
+        }
+        if memory and tracemalloc.is_tracing():
+            mem_end, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["peak"])
+            record["mem_start_mb"] = round(mem_start / 2**20, 3)
+            record["mem_end_mb"] = round(mem_end / 2**20, 3)
+            record["mem_peak_mb"] = round(peak / 2**20, 3)
+            if parent is not None:
+                parent["peak"] = max(parent["peak"], peak)
+        if claim == "owner":
+            _release_memory()
+        record.update(attrs)
+        _write(record, trace_file)
+
+
+def _size_of(x):
+    if isinstance(x, pd.DataFrame):
+        return {"rows": len(x), "cols": x.shape[1], "mb": round(x.memory_usage(index=True).sum() / 2**20, 3)}
+    if isinstance(x, (str, Path)) and os.path.isfile(x):
+        return {"file_mb": round(os.path.getsize(x) / 2**20, 3)}
+    return None
+
+
+def _describe(sig, args, kwargs):
+    out = {}
+    try:
+        named = sig.bind_partial(*args, **kwargs).arguments.items()
+    except TypeError:
+        named = list(enumerate(args)) + list(kwargs.items())
+    for key, val in named:
+        info = _size_of(val)
+        if info:
+            for k, v in info.items():
+                out[f"in_{key}_{k}"] = v
+    return out
+
+
+def traced(name = None):
+    # Wrap a pipeline stage in a span; DataFrame/file inputs and the output size are recorded.
+    def deco(func):
+        label = name or func.__name__
+        sig = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label, **_describe(sig, args, kwargs)) as attrs:
+                result = func(*args, **kwargs)
+                if isinstance(result, pd.DataFrame):
+                    attrs["rows_out"] = len(result)
+                    attrs["cols_out"] = result.shape[1]
+                elif isinstance(result, (list, tuple)):
+                    attrs["items_out"] = len(result)
+                return result
+        return wrapper
+    return deco
+
+
+def profiled(func = None, *, trace_file = TRACE_FILE):
+    # Opt-in cProfile hook (EPPS_PROFILE=1 or enable_profiling()); no-op otherwise.
+    # .prof files go next to the trace file.
+    if func is None:
+        return functools.partial(profiled, trace_file=trace_file)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _profiling:
+            return func(*args, **kwargs)
+
+        prof = cProfile.Profile()
+        with span(f"profile:{func.__name__}", trace_file=trace_file, memory=False) as attrs:
+            result = prof.runcall(func, *args, **kwargs)
+            out_dir = Path(trace_file).parent
+            out_dir.mkdir(parents=True, exist_ok=True)
+            out = out_dir / f"{current_run()}_{func.__name__}_{uuid.uuid4().hex[:8]}.prof"
+            prof.dump_stats(str(out))
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(15)
+            attrs["profile_file"] = str(out)
+            attrs["profile_top"] = buf.getvalue()
+        return result
+    return wrapper
+
+
+def read_trace(trace_file = TRACE_FILE, last_runs = None):
+    # The trace is append-only; with `last_runs` only the newest runs are parsed.
+    path = Path(trace_file)
+    if not path.exists():
+        return pd.DataFrame()
+    with open(path, encoding="utf-8") as fh:
+        lines = fh.readlines()
+
+    rows, seen = deque(), set()
+    for line in reversed(lines):
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        run = rec.get("run_id")
+        if last_runs and run not in seen:
+            if len(seen) >= last_runs:
+                break
+            seen.add(run)
+        rows.appendleft(rec)
+    df = pd.DataFrame(list(rows))
+    if "start" in df.columns:
+        df["start"] = pd.to_datetime(df["start"], utc=True, errors="coerce")
+    return df